@@ -29,6 +29,13 @@ def create_app():
     os.makedirs(upload_dir, exist_ok=True)
     app.config['UPLOAD_FOLDER'] = upload_dir
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB
+    # Resumable uploads: largest photo accepted; partial files stay out of static/
+    app.config['MAX_PHOTO_SIZE'] = int(os.getenv('MAX_PHOTO_SIZE', str(16 * 1024 * 1024)))
+    app.config['PARTIAL_UPLOAD_FOLDER'] = os.path.join(instance_path, 'partial_uploads')
+    os.makedirs(app.config['PARTIAL_UPLOAD_FOLDER'], exist_ok=True)
+
+    # Bulk import: plants inserted per transaction
+    app.config['IMPORT_BATCH_SIZE'] = int(os.getenv('IMPORT_BATCH_SIZE', '2000'))
 
     # Weather
     app.config['OPENWEATHER_API_KEY'] = os.getenv('OPENWEATHER_API_KEY', '')
@@ -71,6 +78,13 @@ def create_app():
     from .blueprints.push import bp as push_bp
     app.register_blueprint(push_bp, url_prefix='/push')
 
+    from .blueprints.api import bp as api_bp
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+
+    # CLI: flask garden import/export/sweep-uploads
+    from .garden_io import register_cli
+    register_cli(app)
+
     # Scheduler: check due reminders and send web-push notifications.
     scheduler = BackgroundScheduler(daemon=True)
 
@@ -81,6 +95,15 @@ def create_app():
             tick_reminders()
 
     scheduler.add_job(_job, 'interval', seconds=60, id='tick_reminders', replace_existing=True)
+
+    # Unlink photo files of deleted plants in batches, off the request path.
+    from .reclaim import reclaim_pending
+
+    def _reclaim_job():
+        with app.app_context():
+            reclaim_pending(app.config['UPLOAD_FOLDER'])
+
+    scheduler.add_job(_reclaim_job, 'interval', seconds=15, id='reclaim_files', replace_existing=True)
     scheduler.start()
 
     # Jinja helpers
@@ -0,0 +1,367 @@
+"""JSON sync API (v1).
+
+List endpoints return rows ordered by (updated_at, id). Pass the returned
+`next_cursor` back as `since` to receive only rows changed after it, and
+poll /deleted the same way to learn about removed rows. Every list response
+carries an ETag, so an unchanged window costs a 304 and two aggregate queries.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+from datetime import date, datetime
+
+from flask import current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy import and_, func, or_
+from werkzeug.datastructures import MultiDict
+
+from ... import db, csrf
+from ...forms import PlantForm, ReminderForm
+from ...garden_io import (
+    iter_export_csv, iter_export_jsonl, iter_export_zip, import_records, read_records,
+)
+from ...models import Plant, PlantPhoto, Reminder, SyncTombstone
+from ...notifications import compute_next_run
+
+from . import bp
+
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+MAX_BATCH = 500
+
+PLANT_FIELDS = ('id', 'name', 'scientific_name', 'origin', 'age_months', 'light', 'water', 'soil', 'notes',
+                'owner', 'created_at', 'updated_at')
+PHOTO_FIELDS = ('id', 'plant_id', 'filename', 'url', 'uploaded_at', 'updated_at')
+REMINDER_FIELDS = ('id', 'plant_id', 'interval_text', 'time_of_day', 'start_date', 'active', 'next_run_at',
+                   'last_sent_at', 'created_at', 'updated_at')
+
+# Plant columns a client may write through the batch endpoint.
+PLANT_WRITABLE = ('name', 'scientific_name', 'origin', 'age_months', 'light', 'water', 'soil', 'notes', 'owner')
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400, **extra):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.extra = extra
+
+
+@bp.errorhandler(ApiError)
+def _api_error(e: ApiError):
+    return jsonify({'ok': False, 'error': e.message, **e.extra}), e.status
+
+
+def _json_value(v):
+    if isinstance(v, datetime):
+        return v.isoformat() + 'Z'
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
+
+
+def _serialize(obj, fields) -> dict:
+    out = {}
+    for f in fields:
+        if f == 'url':
+            out[f] = url_for('static', filename='uploads/' + obj.filename)
+        else:
+            out[f] = _json_value(getattr(obj, f))
+    return out
+
+
+def _parse_fields(allowed: tuple[str, ...]) -> tuple[str, ...]:
+    raw = (request.args.get('fields') or '').strip()
+    if not raw:
+        return allowed
+    wanted = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+    # id and updated_at are needed to apply a delta and to resume from it.
+    return tuple(f for f in allowed if f in ('id', 'updated_at') or f in wanted)
+
+
+def _parse_limit() -> int:
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = f"{ts.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise ApiError('Invalid cursor.')
+
+
+def _etag(*parts) -> str:
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _not_modified(etag: str):
+    resp = current_app.response_class(status=304)
+    resp.set_etag(etag)
+    return resp
+
+
+def _delta_response(model, fields_allowed: tuple[str, ...], query=None):
+    fields = _parse_fields(fields_allowed)
+    limit = _parse_limit()
+    since = request.args.get('since') or ''
+    cursor = _decode_cursor(since)
+
+    q = query if query is not None else model.query
+    if cursor:
+        ts, row_id = cursor
+        q = q.filter(or_(model.updated_at > ts, and_(model.updated_at == ts, model.id > row_id)))
+
+    # Fingerprint the window before loading any rows.
+    count, max_ts = q.with_entities(func.count(model.id), func.max(model.updated_at)).one()
+    etag = _etag(model.__tablename__, since, ','.join(fields), limit, request.args.get('plant_id', ''),
+                 count, max_ts)
+    if etag in request.if_none_match:
+        return _not_modified(etag)
+
+    rows = q.order_by(model.updated_at, model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1].updated_at, rows[-1].id) if rows else since
+
+    resp = jsonify({
+        'ok': True,
+        'data': [_serialize(r, fields) for r in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+
+def _filter_by_plant(model):
+    q = model.query
+    plant_id = request.args.get('plant_id', type=int)
+    if plant_id is not None:
+        q = q.filter(model.plant_id == plant_id)
+    return q
+
+
+@bp.get('/plants')
+def list_plants():
+    return _delta_response(Plant, PLANT_FIELDS)
+
+
+@bp.get('/photos')
+def list_photos():
+    return _delta_response(PlantPhoto, PHOTO_FIELDS, _filter_by_plant(PlantPhoto))
+
+
+@bp.get('/reminders')
+def list_reminders():
+    return _delta_response(Reminder, REMINDER_FIELDS, _filter_by_plant(Reminder))
+
+
+@bp.get('/deleted')
+def list_deleted():
+    """Rows deleted since the cursor, as {table, id} pairs."""
+    since = request.args.get('since', 0, type=int)
+    limit = _parse_limit()
+    q = SyncTombstone.query.filter(SyncTombstone.id > since)
+
+    count, max_id = q.with_entities(func.count(SyncTombstone.id), func.max(SyncTombstone.id)).one()
+    etag = _etag('deleted', since, limit, count, max_id)
+    if etag in request.if_none_match:
+        return _not_modified(etag)
+
+    rows = q.order_by(SyncTombstone.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    resp = jsonify({
+        'ok': True,
+        'data': [{'table': r.table_name, 'id': r.row_id, 'deleted_at': _json_value(r.deleted_at)} for r in rows],
+        'next_cursor': rows[-1].id if rows else since,
+        'has_more': has_more,
+    })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+
+def _batch_items() -> list[dict]:
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        raise ApiError('Expected a non-empty "items" list.')
+    if len(items) > MAX_BATCH:
+        raise ApiError(f'At most {MAX_BATCH} items per batch.')
+    if not all(isinstance(it, dict) for it in items):
+        raise ApiError('Every item must be an object.')
+    return items
+
+
+def _form_data(values: dict) -> MultiDict:
+    return MultiDict({k: str(v) for k, v in values.items() if v is not None})
+
+
+def _check_int_keys(items: list[dict], *keys: str):
+    for i, it in enumerate(items):
+        for key in keys:
+            v = it.get(key)
+            # bool is an int subclass but never a valid id.
+            if v is not None and (not isinstance(v, int) or isinstance(v, bool)):
+                raise ApiError(f'{key} must be an integer.', index=i)
+
+
+def _existing_by_id(model, items: list[dict]) -> dict:
+    _check_int_keys(items, 'id')
+    ids = [it['id'] for it in items if it.get('id') is not None]
+    if not ids:
+        return {}
+    found = {obj.id: obj for obj in model.query.filter(model.id.in_(ids)).all()}
+    for i, it in enumerate(items):
+        if it.get('id') is not None and it['id'] not in found:
+            raise ApiError(f"{model.__tablename__} {it['id']} not found.", 404, index=i)
+    return found
+
+
+@bp.post('/plants/batch')
+@csrf.exempt
+def batch_plants():
+    """Create (no id) or update (with id) plants; the whole batch commits once."""
+    items = _batch_items()
+    existing = _existing_by_id(Plant, items)
+
+    saved = []
+    for i, item in enumerate(items):
+        plant = existing.get(item.get('id'))
+        values = {f: getattr(plant, f) for f in PLANT_WRITABLE} if plant else {}
+        values.update({k: v for k, v in item.items() if k in PLANT_WRITABLE})
+
+        form = PlantForm(formdata=_form_data(values), meta={'csrf': False})
+        if not form.validate():
+            db.session.rollback()
+            raise ApiError('Validation failed.', index=i, errors=form.errors)
+
+        if plant is None:
+            plant = Plant()
+            db.session.add(plant)
+        for f in PLANT_WRITABLE:
+            setattr(plant, f, getattr(form, f).data)
+        saved.append(plant)
+
+    # Serialize before the commit expires the rows, or each one is re-SELECTed.
+    db.session.flush()
+    data = [_serialize(p, PLANT_FIELDS) for p in saved]
+    db.session.commit()
+    return jsonify({'ok': True, 'data': data})
+
+
+@bp.post('/reminders/batch')
+@csrf.exempt
+def batch_reminders():
+    """Create (no id) or update (with id) reminders; the whole batch commits once."""
+    items = _batch_items()
+    _check_int_keys(items, 'plant_id')
+    existing = _existing_by_id(Reminder, items)
+
+    plant_ids = {it['plant_id'] for it in items if it.get('plant_id') is not None}
+    known_plants = {pid for (pid,) in db.session.query(Plant.id).filter(Plant.id.in_(plant_ids)).all()}
+
+    today = datetime.utcnow().date()
+    saved = []
+    for i, item in enumerate(items):
+        rem = existing.get(item.get('id'))
+        plant_id = item.get('plant_id', rem.plant_id if rem else None)
+        if plant_id is None or (plant_id not in known_plants and not (rem and plant_id == rem.plant_id)):
+            db.session.rollback()
+            raise ApiError('Unknown or missing plant_id.', index=i)
+
+        values = {'interval_text': rem.interval_text, 'time_of_day': rem.time_of_day} if rem else {}
+        values.update({k: v for k, v in item.items() if k in ('interval_text', 'time_of_day')})
+        form = ReminderForm(formdata=_form_data(values), meta={'csrf': False})
+        if not form.validate():
+            db.session.rollback()
+            raise ApiError('Validation failed.', index=i, errors=form.errors)
+
+        if rem is None:
+            rem = Reminder(plant_id=plant_id, start_date=today)
+            db.session.add(rem)
+        rescheduled = (rem.interval_text, rem.time_of_day) != (form.interval_text.data, form.time_of_day.data)
+        rem.plant_id = plant_id
+        rem.interval_text = form.interval_text.data
+        rem.time_of_day = form.time_of_day.data
+        if 'active' in item:
+            rem.active = bool(item['active'])
+        if rescheduled or rem.next_run_at is None:
+            rem.next_run_at = compute_next_run(rem.interval_text, rem.time_of_day, start=rem.start_date or today)
+        saved.append(rem)
+
+    db.session.flush()
+    data = [_serialize(r, REMINDER_FIELDS) for r in saved]
+    db.session.commit()
+    return jsonify({'ok': True, 'data': data})
+
+
+_EXPORT_FORMATS = {
+    'jsonl': ('application/x-ndjson', 'garden.jsonl'),
+    'csv': ('text/csv', 'garden.csv'),
+    'zip': ('application/zip', 'garden.zip'),
+}
+
+
+@bp.get('/export')
+def export_garden():
+    """Stream the whole garden as JSONL (default), CSV, or a zip including photos."""
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in _EXPORT_FORMATS:
+        raise ApiError('format must be one of jsonl, csv, zip.')
+    mimetype, filename = _EXPORT_FORMATS[fmt]
+    if fmt == 'zip':
+        gen = iter_export_zip(current_app.config['UPLOAD_FOLDER'])
+    elif fmt == 'csv':
+        gen = iter_export_csv()
+    else:
+        gen = iter_export_jsonl()
+    resp = current_app.response_class(stream_with_context(gen), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return resp
+
+
+# Only non-"simple" content types: a cross-site form or no-cors fetch cannot
+# send these without a CORS preflight, which this API never answers.
+_IMPORT_FORMATS = {
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'text/csv': 'csv',
+}
+
+
+@bp.post('/import')
+@csrf.exempt
+def import_garden():
+    """Import JSONL or CSV sent as the raw request body (not multipart).
+
+    The Content-Type picks the format: application/x-ndjson (or
+    application/jsonl) or text/csv. The body is read line by line from the
+    request stream and inserted in batches, so it is never held in memory as
+    a whole.
+    """
+    fmt = _IMPORT_FORMATS.get(request.mimetype)
+    if fmt is None:
+        raise ApiError('Content-Type must be application/x-ndjson or text/csv.', 415)
+    records = read_records(io.BufferedReader(request.stream), fmt)
+    batch_size = request.args.get('batch_size', current_app.config['IMPORT_BATCH_SIZE'], type=int)
+    stats = import_records(records, current_app.config['UPLOAD_FOLDER'], batch_size)
+    return jsonify({'ok': True, **stats})
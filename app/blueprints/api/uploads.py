@@ -0,0 +1,222 @@
+"""Resumable, chunked photo uploads.
+
+  POST   /uploads           {"plant_id": 1, "size": 123456}  -> upload id, offset 0
+  GET    /uploads/<id>      current offset (also as the Upload-Offset header)
+  PATCH  /uploads/<id>      raw bytes, Upload-Offset: <offset the chunk starts at>
+  DELETE /uploads/<id>      abandon the upload
+
+PATCH bodies are read from the request stream in small blocks and appended
+to a partial file, so memory per upload stays constant. The offset is the
+partial file's size on disk: after a dropped connection the client asks for
+it and resends only the rest. Each PATCH holds an exclusive lock on the part
+file, so a retry that overlaps a stalled request gets a 423 instead of
+interleaving writes. Content is checked by magic bytes before anything past
+the first 12 bytes is written; when the last byte lands the file is moved
+into UPLOAD_FOLDER and a PlantPhoto is created.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from flask import current_app, jsonify, request, url_for
+
+from ... import db, csrf
+from ...models import Plant, PlantPhoto, UploadSession
+from ...utils import MAGIC_HEAD_BYTES, sniff_image_ext
+
+from . import bp
+from .routes import PHOTO_FIELDS, ApiError, _serialize
+
+
+STREAM_BLOCK = 64 * 1024
+
+
+def _partial_path(upload: UploadSession) -> str:
+    return os.path.join(current_app.config['PARTIAL_UPLOAD_FOLDER'], f'{upload.id}.part')
+
+
+def _offset(upload: UploadSession) -> int:
+    try:
+        return os.path.getsize(_partial_path(upload))
+    except OSError:
+        return 0
+
+
+def _get_upload_or_404(upload_id: str) -> UploadSession:
+    upload = UploadSession.query.get(upload_id)
+    if not upload:
+        raise ApiError('Upload not found.', 404)
+    return upload
+
+
+def _status(upload: UploadSession, offset: int, status: int = 200):
+    resp = jsonify({'ok': True, 'upload_id': upload.id, 'offset': offset, 'size': upload.total_size})
+    resp.status_code = status
+    resp.headers['Upload-Offset'] = str(offset)
+    resp.headers['Upload-Length'] = str(upload.total_size)
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+def _discard(upload: UploadSession):
+    try:
+        os.remove(_partial_path(upload))
+    except OSError:
+        pass
+    db.session.delete(upload)
+    db.session.commit()
+
+
+@bp.post('/uploads')
+@csrf.exempt
+def create_upload():
+    data = request.get_json(silent=True) or {}
+    try:
+        plant_id = int(data.get('plant_id'))
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        raise ApiError('plant_id and size are required integers.')
+    if size <= 0 or size > current_app.config['MAX_PHOTO_SIZE']:
+        raise ApiError(f"size must be between 1 and {current_app.config['MAX_PHOTO_SIZE']} bytes.", 413)
+    if not Plant.query.get(plant_id):
+        raise ApiError('Plant not found.', 404)
+
+    upload = UploadSession(id=secrets.token_hex(12), plant_id=plant_id, total_size=size)
+    db.session.add(upload)
+    db.session.commit()
+    open(_partial_path(upload), 'wb').close()
+
+    resp = _status(upload, 0, 201)
+    resp.headers['Location'] = url_for('api.upload_status', upload_id=upload.id)
+    return resp
+
+
+@bp.get('/uploads/<upload_id>')
+def upload_status(upload_id: str):
+    upload = _get_upload_or_404(upload_id)
+    return _status(upload, _offset(upload))
+
+
+@bp.delete('/uploads/<upload_id>')
+@csrf.exempt
+def cancel_upload(upload_id: str):
+    _discard(_get_upload_or_404(upload_id))
+    return jsonify({'ok': True})
+
+
+def _try_lock(f, upload: UploadSession) -> bool:
+    """Take an exclusive, non-blocking lock on the open part file."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # Windows: lock one byte past the declared size, a region never written.
+            f.seek(upload.total_size)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _open_part(path: str):
+    # No O_CREAT: a part file that was finalised or discarded must not come back.
+    fd = os.open(path, os.O_RDWR | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+    return os.fdopen(fd, 'a+b')
+
+
+def _size(f) -> int:
+    f.flush()
+    return os.fstat(f.fileno()).st_size
+
+
+def _check_magic(f, upload: UploadSession, head: bytes, need: int):
+    """Validate the file type once `need` leading bytes are known."""
+    if len(head) < need:
+        return
+    ext = sniff_image_ext(head)
+    if ext is None:
+        f.close()
+        _discard(upload)
+        raise ApiError('Unsupported file type. Use PNG/JPG/WEBP.', 415)
+    upload.ext = ext
+    db.session.commit()
+
+
+@bp.patch('/uploads/<upload_id>')
+@csrf.exempt
+def append_upload(upload_id: str):
+    upload = _get_upload_or_404(upload_id)
+    path = _partial_path(upload)
+    claimed = request.headers.get('Upload-Offset', type=int)
+
+    try:
+        f = _open_part(path)
+    except FileNotFoundError:
+        raise ApiError('Upload not found.', 404)
+
+    with f:
+        # One writer per upload: a client retry while its stalled first request
+        # is still streaming must not interleave bytes with it.
+        if not _try_lock(f, upload):
+            raise ApiError('Another request is writing to this upload.', 423, offset=_size(f))
+        # The previous holder may have finalised the upload before we got the lock.
+        # Re-read the row from the database: the copy loaded above is cached
+        # in the session and would not show a delete, nor an ext it just set.
+        try:
+            moved = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            moved = True
+        if moved or not db.session.get(UploadSession, upload.id, populate_existing=True):
+            raise ApiError('Upload not found.', 404)
+
+        start = _size(f)
+        if claimed is None or claimed != start:
+            # Client is out of sync (e.g. after a dropped connection): tell it where to resume.
+            return jsonify({'ok': False, 'error': 'Offset mismatch.', 'offset': start}), 409
+        if (request.content_length or 0) > upload.total_size - start:
+            raise ApiError('Chunk goes past the declared size.', 413, offset=start)
+
+        need = min(MAGIC_HEAD_BYTES, upload.total_size)
+        head = b''
+        if upload.ext is None:
+            f.seek(0)
+            head = f.read(need)
+
+        stream = request.stream
+        while True:
+            block = stream.read(STREAM_BLOCK)
+            if not block:
+                break
+            if _size(f) + len(block) > upload.total_size:
+                # Body without a Content-Length: drop the whole chunk.
+                f.truncate(start)
+                raise ApiError('Chunk goes past the declared size.', 413, offset=start)
+            if upload.ext is None:
+                # Reject before any non-image bytes reach the disk.
+                head = (head + block)[:need]
+                _check_magic(f, upload, head, need)
+            f.write(block)
+
+        offset = _size(f)
+        if upload.ext is None:
+            _check_magic(f, upload, head, need)
+        if offset < upload.total_size:
+            return _status(upload, offset)
+
+        # Complete: move into the photo store and attach to the plant, still under the lock.
+        filename = f'{upload.id}{upload.ext}'
+        shutil.move(path, os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+    photo = PlantPhoto(plant_id=upload.plant_id, filename=filename)
+    db.session.add(photo)
+    db.session.delete(upload)
+    db.session.commit()
+    return jsonify({'ok': True, 'offset': offset, 'size': offset, 'photo': _serialize(photo, PHOTO_FIELDS)}), 201
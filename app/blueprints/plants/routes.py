@@ -1,11 +1,12 @@
 from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
 from werkzeug.exceptions import NotFound
 
-from ... import db
+from ... import bulk, db
 from ...forms import PlantForm, ReminderForm
 from ...models import Plant, PlantPhoto, Reminder
 from ...utils import save_upload
 from ...notifications import compute_next_run
+from ...search import search_plants
 
 bp = Blueprint('plants', __name__)
 
@@ -21,7 +22,15 @@ def _get_plant_or_404(plant_id: int) -> Plant:
 def list_plants():
     view = request.args.get('view', 'grid')  # grid | list | single
     plants = Plant.query.order_by(Plant.created_at.desc()).all()
-    return render_template('plants/list.html', plants=plants, view=view)
+    bulk_form = ReminderForm(prefix='bulk')
+    return render_template('plants/list.html', plants=plants, view=view, bulk_form=bulk_form)
+
+
+@bp.get('/search')
+def search():
+    q = (request.args.get('q') or '').strip()
+    results = search_plants(q, limit=request.args.get('limit', 50, type=int)) if q else []
+    return render_template('plants/search.html', q=q, results=results)
 
 
 @bp.route('/add', methods=['GET', 'POST'])
@@ -37,6 +46,7 @@ def add_plant():
             water=form.water.data,
             soil=form.soil.data,
             notes=form.notes.data,
+            owner=form.owner.data,
         )
         db.session.add(plant)
         db.session.commit()
@@ -112,12 +122,61 @@ def edit(plant_id: int):
 @bp.post('/<int:plant_id>/delete')
 def delete(plant_id: int):
     plant = _get_plant_or_404(plant_id)
-    db.session.delete(plant)
-    db.session.commit()
+    bulk.delete_plants([plant.id])
     flash('Plant deleted.', 'success')
     return redirect(url_for('plants.list_plants'))
 
 
+def _selected_plant_ids() -> list[int]:
+    ids = request.form.getlist('plant_ids', type=int)
+    if not ids:
+        flash('Select at least one plant.', 'error')
+    return ids
+
+
+def _back_to_list():
+    return redirect(url_for('plants.list_plants', view='list'))
+
+
+@bp.post('/bulk/delete')
+def bulk_delete():
+    ids = _selected_plant_ids()
+    if ids:
+        n = bulk.delete_plants(ids)
+        flash(f'{n} plant(s) deleted.', 'success')
+    return _back_to_list()
+
+
+@bp.post('/bulk/reschedule')
+def bulk_reschedule():
+    ids = _selected_plant_ids()
+    form = ReminderForm(prefix='bulk')
+    if ids and not form.validate_on_submit():
+        flash('Enter an interval (e.g. 2 weeks) and a time (e.g. 09:00).', 'error')
+    elif ids:
+        n = bulk.reschedule_reminders(ids, form.interval_text.data, form.time_of_day.data)
+        flash(f'{n} reminder(s) rescheduled.', 'success')
+    return _back_to_list()
+
+
+@bp.post('/bulk/pause')
+def bulk_pause():
+    ids = _selected_plant_ids()
+    if ids:
+        n = bulk.set_reminders_active(ids, False)
+        flash(f'{n} reminder(s) paused.', 'success')
+    return _back_to_list()
+
+
+@bp.post('/bulk/resume')
+def bulk_resume():
+    ids = _selected_plant_ids()
+    if ids:
+        n = bulk.set_reminders_active(ids, True)
+        flash(f'{n} reminder(s) resumed.', 'success')
+    return _back_to_list()
+
+
 @bp.post('/<int:plant_id>/photos/add')
 def add_photos(plant_id: int):
     plant = _get_plant_or_404(plant_id)
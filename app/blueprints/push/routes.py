@@ -4,7 +4,7 @@ import os
 from flask import jsonify, request
 
 from ... import db, csrf
-from ...models import PushSubscription
+from ...models import Plant, PlantPushPreference, PushSubscription
 
 from . import bp
 
@@ -23,16 +23,21 @@ def subscribe():
     keys = data.get('keys') or {}
     p256dh = (keys.get('p256dh') or '').strip()
     auth = (keys.get('auth') or '').strip()
+    owner = data.get('owner') or ''
 
     if not endpoint or not p256dh or not auth:
         return jsonify({'ok': False, 'error': 'Invalid subscription payload.'}), 400
+    if not isinstance(owner, str):
+        return jsonify({'ok': False, 'error': 'owner must be a string.'}), 400
+    owner = owner.strip()[:120]
 
     sub = PushSubscription.query.filter_by(endpoint=endpoint).first()
     if sub:
         sub.p256dh = p256dh
         sub.auth = auth
+        sub.owner = owner
     else:
-        sub = PushSubscription(endpoint=endpoint, p256dh=p256dh, auth=auth)
+        sub = PushSubscription(endpoint=endpoint, p256dh=p256dh, auth=auth, owner=owner)
         db.session.add(sub)
     db.session.commit()
     return jsonify({'ok': True})
@@ -50,3 +55,31 @@ def unsubscribe():
         db.session.delete(sub)
         db.session.commit()
     return jsonify({'ok': True})
+
+
+@bp.post('/plants/<int:plant_id>/preference')
+@csrf.exempt
+def plant_preference(plant_id: int):
+    """Set this device's notifications for one plant: follow, mute, or default (household rule)."""
+    data = request.get_json(silent=True) or {}
+    endpoint = (data.get('endpoint') or '').strip()
+    mode = (data.get('mode') or '').strip()
+    if mode not in PlantPushPreference.MODES + ('default',):
+        return jsonify({'ok': False, 'error': 'Mode must be follow, mute or default.'}), 400
+
+    sub = PushSubscription.query.filter_by(endpoint=endpoint).first() if endpoint else None
+    if not sub:
+        return jsonify({'ok': False, 'error': 'Unknown subscription. Enable notifications first.'}), 404
+    if not Plant.query.get(int(plant_id)):
+        return jsonify({'ok': False, 'error': 'Plant not found.'}), 404
+
+    pref = PlantPushPreference.query.filter_by(subscription_id=sub.id, plant_id=plant_id).first()
+    if mode == 'default':
+        if pref:
+            db.session.delete(pref)
+    elif pref:
+        pref.mode = mode
+    else:
+        db.session.add(PlantPushPreference(subscription_id=sub.id, plant_id=plant_id, mode=mode))
+    db.session.commit()
+    return jsonify({'ok': True, 'mode': mode})
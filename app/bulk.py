@@ -0,0 +1,104 @@
+"""Set-based operations over many plants at once.
+
+Each function issues a handful of DELETE/UPDATE statements keyed by plant id
+instead of loading rows through the ORM, so the cost does not depend on how
+many photos or reminders the plants have. Bulk statements bypass mapper
+events, so sync tombstones are written here explicitly.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, insert, literal, select, update
+
+from . import db, reclaim
+from .models import Plant, PlantPhoto, PlantPushPreference, Reminder, SyncTombstone, UploadSession
+from .notifications import compute_next_run
+
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+CHUNK = 500
+
+_NO_SYNC = {'synchronize_session': False}
+
+
+def _chunks(ids: list[int]):
+    ids = sorted(set(ids))
+    for i in range(0, len(ids), CHUNK):
+        yield ids[i:i + CHUNK]
+
+
+def _tombstones(model, where, now: datetime):
+    db.session.execute(
+        insert(SyncTombstone).from_select(
+            ['table_name', 'row_id', 'deleted_at'],
+            select(literal(model.__tablename__), model.id, literal(now)).where(where),
+        )
+    )
+
+
+def delete_plants(plant_ids: list[int]) -> int:
+    """Delete plants with their photos, reminders and push preferences.
+
+    Photo files are handed to the background reclaimer after the commit.
+    Returns the number of plants deleted.
+    """
+    now = datetime.utcnow()
+    deleted = 0
+    filenames: list[str] = []
+    try:
+        for chunk in _chunks(plant_ids):
+            filenames.extend(db.session.scalars(
+                select(PlantPhoto.filename).where(PlantPhoto.plant_id.in_(chunk))
+            ))
+            for model in (Reminder, PlantPhoto):
+                _tombstones(model, model.plant_id.in_(chunk), now)
+                db.session.execute(delete(model).where(model.plant_id.in_(chunk)), execution_options=_NO_SYNC)
+            for model in (PlantPushPreference, UploadSession):
+                db.session.execute(delete(model).where(model.plant_id.in_(chunk)), execution_options=_NO_SYNC)
+            _tombstones(Plant, Plant.id.in_(chunk), now)
+            result = db.session.execute(delete(Plant).where(Plant.id.in_(chunk)), execution_options=_NO_SYNC)
+            deleted += result.rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    # Objects already loaded in this session are stale now.
+    db.session.expire_all()
+    reclaim.enqueue(filenames)
+    return deleted
+
+
+def reschedule_reminders(plant_ids: list[int], interval_text: str, time_of_day: str) -> int:
+    """Give every reminder of the plants the same schedule, starting today."""
+    today = datetime.utcnow().date()
+    next_run_at = compute_next_run(interval_text, time_of_day, start=today)
+    return _update_reminders(plant_ids, interval_text=interval_text, time_of_day=time_of_day,
+                             start_date=today, next_run_at=next_run_at)
+
+
+def set_reminders_active(plant_ids: list[int], active: bool) -> int:
+    """Pause or resume every reminder of the plants.
+
+    Resumed reminders keep their next_run_at, so an overdue one fires on the
+    next tick and then rolls forward as usual.
+    """
+    return _update_reminders(plant_ids, active=active)
+
+
+def _update_reminders(plant_ids: list[int], **values) -> int:
+    changed = 0
+    try:
+        for chunk in _chunks(plant_ids):
+            result = db.session.execute(
+                update(Reminder).where(Reminder.plant_id.in_(chunk)).values(**values),
+                execution_options=_NO_SYNC,
+            )
+            changed += result.rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.expire_all()
+    return changed
@@ -16,8 +16,62 @@ def _has_column(conn, table: str, column: str) -> bool:
     return any(r[1] == column for r in rows)
 
 
+def _has_table(conn, name: str) -> bool:
+    return conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name=:n"), {'n': name}
+    ).fetchone() is not None
+
+
+# Columns mirrored into the plants_fts index (order matters for bm25 weights).
+PLANT_FTS_COLUMNS = ('name', 'scientific_name', 'origin', 'light', 'water', 'soil', 'notes')
+
+
+def _ensure_plants_fts(conn):
+    """Create the FTS5 index over plants and the triggers that keep it in sync.
+
+    The index is an external-content table: it stores only the inverted index
+    and reads column values back from `plants`, so rows are not duplicated.
+    If this SQLite build lacks FTS5, search falls back to LIKE queries.
+    """
+    if _has_table(conn, 'plants_fts'):
+        return
+
+    cols = ', '.join(PLANT_FTS_COLUMNS)
+    new_vals = ', '.join(f'new.{c}' for c in PLANT_FTS_COLUMNS)
+    old_vals = ', '.join(f'old.{c}' for c in PLANT_FTS_COLUMNS)
+    try:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE plants_fts USING fts5("
+            f"{cols}, content='plants', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+    except Exception:
+        # sqlite3 compiled without FTS5
+        return
+
+    conn.execute(text(
+        f"CREATE TRIGGER plants_fts_ai AFTER INSERT ON plants BEGIN "
+        f"INSERT INTO plants_fts(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER plants_fts_ad AFTER DELETE ON plants BEGIN "
+        f"INSERT INTO plants_fts(plants_fts, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END"
+    ))
+    # Only re-index when an indexed column changes (not on updated_at bumps).
+    conn.execute(text(
+        f"CREATE TRIGGER plants_fts_au AFTER UPDATE OF {cols} ON plants BEGIN "
+        f"INSERT INTO plants_fts(plants_fts, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO plants_fts(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+    ))
+    # Index rows that existed before the table was created.
+    conn.execute(text("INSERT INTO plants_fts(plants_fts) VALUES ('rebuild')"))
+
+
 def run_sqlite_migrations(db):
     engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        # DATABASE_URL points at another backend; create_all() handles the schema.
+        return
     with engine.begin() as conn:
         # reminders table: add columns if this is an older DB
         if conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='reminders'")).fetchone():
@@ -27,6 +81,23 @@ def run_sqlite_migrations(db):
                 conn.execute(text("ALTER TABLE reminders ADD COLUMN next_run_at DATETIME"))
             if not _has_column(conn, 'reminders', 'last_sent_at'):
                 conn.execute(text("ALTER TABLE reminders ADD COLUMN last_sent_at DATETIME"))
+            if not _has_column(conn, 'reminders', 'updated_at'):
+                conn.execute(text("ALTER TABLE reminders ADD COLUMN updated_at DATETIME"))
+                conn.execute(text("UPDATE reminders SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)"))
+
+        # plant_photos table: updated_at drives the sync API's delta cursors
+        if _has_table(conn, 'plant_photos') and not _has_column(conn, 'plant_photos', 'updated_at'):
+            conn.execute(text("ALTER TABLE plant_photos ADD COLUMN updated_at DATETIME"))
+            conn.execute(text("UPDATE plant_photos SET updated_at = COALESCE(uploaded_at, CURRENT_TIMESTAMP)"))
+
+        if _has_table(conn, 'plants'):
+            conn.execute(text("UPDATE plants SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+                              "WHERE updated_at IS NULL"))
+
+        # indexes declared on the models that create_all() won't add to existing tables
+        for table in ('plants', 'plant_photos', 'reminders'):
+            if _has_table(conn, table):
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)"))
 
         # push_subscriptions table
         if not conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='push_subscriptions'"))\
@@ -44,3 +115,16 @@ def run_sqlite_migrations(db):
                     """
                 )
             )
+
+        # push routing: plants and subscriptions are matched by household
+        for table in ('plants', 'push_subscriptions'):
+            if _has_table(conn, table) and not _has_column(conn, table, 'owner'):
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN owner VARCHAR(120) NOT NULL DEFAULT ''"))
+            if _has_table(conn, table):
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_owner ON {table} (owner)"))
+        if _has_table(conn, 'reminders'):
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reminders_due ON reminders (active, next_run_at)"))
+
+        # full-text search index over plants
+        if _has_table(conn, 'plants'):
+            _ensure_plants_fts(conn)
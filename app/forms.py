@@ -15,6 +15,9 @@ class PlantForm(FlaskForm):
 
     notes = TextAreaField('Notes', validators=[Optional(), Length(max=4000)])
 
+    owner = StringField('Household', validators=[Optional(), Length(max=120)],
+                        filters=[lambda s: (s or '').strip()])
+
     photos = MultipleFileField('Photos')
 
     submit = SubmitField('Save')
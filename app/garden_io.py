@@ -0,0 +1,438 @@
+"""Bulk import/export of the garden as JSONL, CSV or a zip with photos.
+
+Exports are generators that page through plants by id, so a streamed
+response or file write keeps memory flat regardless of collection size.
+Imports consume any iterable of records and insert them in batches of
+IMPORT_BATCH_SIZE plants (plus their photos and reminders) per transaction.
+
+JSONL record (one plant per line):
+  {"name": "...", "light": "...", ..., "photos": ["abc.jpg"],
+   "reminders": [{"interval_text": "2 weeks", "time_of_day": "09:00",
+                  "start_date": "2024-05-01", "active": true}]}
+
+CSV uses the same plant columns; `photos` is a ';'-separated list of
+filenames and `reminders` a ';'-separated list of "2 weeks@09:00" entries.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import zipfile
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+import click
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+from werkzeug.utils import secure_filename
+
+from . import db
+from .models import Plant, PlantPhoto, Reminder
+from .notifications import compute_next_run
+from .utils import ALLOWED_EXT, MAGIC_HEAD_BYTES, sniff_image_ext
+
+
+PLANT_COLUMNS = ('name', 'scientific_name', 'origin', 'age_months', 'light', 'water', 'soil', 'notes', 'owner')
+CSV_COLUMNS = PLANT_COLUMNS + ('photos', 'reminders')
+
+EXPORT_PAGE_SIZE = 500
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+
+ZIP_RECORDS_NAME = 'plants.jsonl'
+ZIP_PHOTOS_DIR = 'photos/'
+
+
+# ---------------------------------------------------------------- export
+
+def _iter_plants() -> Iterator[Plant]:
+    last_id = 0
+    while True:
+        page = (
+            Plant.query
+            .options(selectinload(Plant.photos), selectinload(Plant.reminders))
+            .filter(Plant.id > last_id)
+            .order_by(Plant.id)
+            .limit(EXPORT_PAGE_SIZE)
+            .all()
+        )
+        if not page:
+            return
+        yield from page
+        last_id = page[-1].id
+        # Drop the page from the identity map so memory doesn't grow.
+        db.session.expunge_all()
+
+
+def plant_record(plant: Plant) -> dict:
+    rec = {c: getattr(plant, c) for c in PLANT_COLUMNS}
+    rec['photos'] = [ph.filename for ph in plant.photos]
+    rec['reminders'] = [
+        {
+            'interval_text': r.interval_text,
+            'time_of_day': r.time_of_day,
+            'start_date': r.start_date.isoformat() if r.start_date else None,
+            'active': bool(r.active) if r.active is not None else True,
+        }
+        for r in plant.reminders
+    ]
+    return rec
+
+
+def iter_export_jsonl() -> Iterator[str]:
+    for plant in _iter_plants():
+        yield json.dumps(plant_record(plant), ensure_ascii=False) + '\n'
+
+
+def iter_export_csv() -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for plant in _iter_plants():
+        rec = plant_record(plant)
+        rec['photos'] = ';'.join(rec['photos'])
+        rec['reminders'] = ';'.join(f"{r['interval_text']}@{r['time_of_day']}" for r in rec['reminders'])
+        writer.writerow(rec)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink; zipfile then streams with data descriptors."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_export_zip(upload_folder: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Zip with plants.jsonl plus every referenced photo under photos/."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        records = zipfile.ZipInfo(ZIP_RECORDS_NAME, date_time=datetime.now().timetuple()[:6])
+        records.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(records, 'w') as out:
+            for plant in _iter_plants():
+                out.write((json.dumps(plant_record(plant), ensure_ascii=False) + '\n').encode('utf-8'))
+                yield sink.drain()
+
+        # Second pass over the filenames, streamed from the database.
+        filenames = (
+            db.session.query(PlantPhoto.filename)
+            .distinct()
+            .order_by(PlantPhoto.filename)
+            .yield_per(1000)
+        )
+        for (filename,) in filenames:
+            path = os.path.join(upload_folder, filename)
+            if not os.path.isfile(path):
+                continue
+            # from_file keeps the photo's mtime; entries stay stored since images are already compressed.
+            info = zipfile.ZipInfo.from_file(path, ZIP_PHOTOS_DIR + filename)
+            with open(path, 'rb') as src, zf.open(info, 'w') as out:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    yield sink.drain()
+    yield sink.drain()
+
+
+# ---------------------------------------------------------------- import
+
+def iter_jsonl_records(lines: Iterable[bytes | str]) -> Iterator[tuple[int, dict | Exception]]:
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            # Decode per line so invalid UTF-8 is reported like any other bad line.
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            rec = json.loads(line)
+            if not isinstance(rec, dict):
+                raise ValueError('expected a JSON object')
+            yield lineno, rec
+        except ValueError as e:
+            yield lineno, e
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[tuple[int, dict | Exception]]:
+    reader = csv.DictReader(lines)
+    for rec in reader:
+        lineno = reader.line_num
+        rec = {k: (v if v != '' else None) for k, v in rec.items() if k}
+        rec['photos'] = [p for p in (rec.get('photos') or '').split(';') if p.strip()]
+        reminders = []
+        for entry in (rec.get('reminders') or '').split(';'):
+            if not entry.strip():
+                continue
+            interval_text, _, time_of_day = entry.partition('@')
+            reminders.append({'interval_text': interval_text.strip(), 'time_of_day': time_of_day.strip() or '09:00'})
+        rec['reminders'] = reminders
+        yield lineno, rec
+
+
+def read_records(stream, fmt: str) -> Iterator[tuple[int, dict | Exception]]:
+    """Records from a binary stream of JSONL or CSV."""
+    if fmt == 'csv':
+        # csv needs text; undecodable bytes become U+FFFD instead of aborting the import.
+        return iter_csv_records(io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline=''))
+    return iter_jsonl_records(stream)
+
+
+# Same bounds as PlantForm.age_months.
+AGE_MONTHS_RANGE = (0, 600)
+
+
+def _clean_str(model, column: str, value) -> str | None:
+    value = str(value).strip() if value is not None else None
+    limit = model.__table__.c[column].type.length
+    if limit and value and len(value) > limit:
+        raise ValueError(f'{column} longer than {limit} characters')
+    return value
+
+
+def _clean_age(value) -> int | None:
+    if value in (None, ''):
+        return None
+    try:
+        age = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('age_months must be an integer') from None
+    lo, hi = AGE_MONTHS_RANGE
+    if not lo <= age <= hi:
+        raise ValueError(f'age_months must be between {lo} and {hi}')
+    return age
+
+
+def _clean_plant(rec: dict) -> dict:
+    row = {}
+    for c in PLANT_COLUMNS:
+        if c == 'age_months':
+            row[c] = _clean_age(rec.get(c))
+            continue
+        row[c] = _clean_str(Plant, c, rec.get(c)) or ('' if c == 'owner' else None)
+    if not row['name']:
+        raise ValueError('name is required')
+    return row
+
+
+def _clean_reminders(rec: dict) -> list[dict]:
+    out = []
+    for r in rec.get('reminders') or []:
+        if not isinstance(r, dict):
+            raise ValueError('reminder needs interval_text')
+        interval_text = _clean_str(Reminder, 'interval_text', r.get('interval_text'))
+        if not interval_text:
+            raise ValueError('reminder needs interval_text')
+        start = r.get('start_date')
+        out.append({
+            'interval_text': interval_text,
+            'time_of_day': _clean_str(Reminder, 'time_of_day', r.get('time_of_day')) or '09:00',
+            'start_date': date.fromisoformat(start) if start else None,
+            'active': bool(r.get('active', True)),
+        })
+    return out
+
+
+class _Importer:
+    def __init__(self, upload_folder: str | None, batch_size: int):
+        self.upload_folder = upload_folder
+        self.batch_size = max(1, batch_size)
+        self.now = datetime.utcnow()
+        self.batch: list[tuple[dict, list[str], list[dict]]] = []
+        self.stats = {'plants': 0, 'photos': 0, 'reminders': 0, 'skipped': 0, 'errors': []}
+        # Many imported reminders share a schedule; compute each one once.
+        self._next_run: dict[tuple, datetime] = {}
+
+    def error(self, lineno: int, msg: str):
+        self.stats['skipped'] += 1
+        if len(self.stats['errors']) < MAX_REPORTED_ERRORS:
+            self.stats['errors'].append({'line': lineno, 'error': msg})
+
+    def add(self, lineno: int, rec: dict):
+        try:
+            plant = _clean_plant(rec)
+            reminders = _clean_reminders(rec)
+        except (ValueError, TypeError) as e:
+            self.error(lineno, str(e))
+            return
+        photos = []
+        for name in rec.get('photos') or []:
+            name = secure_filename(str(name))
+            # Only link photos that are actually present in the upload folder.
+            if name and self.upload_folder and os.path.isfile(os.path.join(self.upload_folder, name)):
+                photos.append(name)
+        self.batch.append((plant, photos, reminders))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def _next_run_at(self, r: dict) -> datetime:
+        start = r['start_date'] or self.now.date()
+        key = (r['interval_text'], r['time_of_day'], start)
+        if key not in self._next_run:
+            self._next_run[key] = compute_next_run(r['interval_text'], r['time_of_day'], start=start, now=self.now)
+        return self._next_run[key]
+
+    def flush(self):
+        if not self.batch:
+            return
+        plant_ids = db.session.scalars(
+            insert(Plant).returning(Plant.id, sort_by_parameter_order=True),
+            [plant for plant, _, _ in self.batch],
+        ).all()
+
+        photo_rows, reminder_rows = [], []
+        for plant_id, (_, photos, reminders) in zip(plant_ids, self.batch):
+            photo_rows.extend({'plant_id': plant_id, 'filename': f} for f in photos)
+            reminder_rows.extend(
+                {**r, 'plant_id': plant_id, 'start_date': r['start_date'] or self.now.date(),
+                 'next_run_at': self._next_run_at(r)}
+                for r in reminders
+            )
+        if photo_rows:
+            db.session.execute(insert(PlantPhoto), photo_rows)
+        if reminder_rows:
+            db.session.execute(insert(Reminder), reminder_rows)
+        db.session.commit()
+
+        self.stats['plants'] += len(plant_ids)
+        self.stats['photos'] += len(photo_rows)
+        self.stats['reminders'] += len(reminder_rows)
+        self.batch.clear()
+
+
+def import_records(records: Iterable[tuple[int, dict | Exception]], upload_folder: str | None = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Insert (lineno, record) pairs in batches; bad records are skipped and reported."""
+    importer = _Importer(upload_folder, batch_size)
+    try:
+        for lineno, rec in records:
+            if isinstance(rec, Exception):
+                importer.error(lineno, str(rec))
+            else:
+                importer.add(lineno, rec)
+        importer.flush()
+    except Exception:
+        db.session.rollback()
+        raise
+    return importer.stats
+
+
+def import_zip(path: str, upload_folder: str, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Import an archive produced by iter_export_zip, copying its photos first.
+
+    Photos are served from static/, so members that are not a PNG/JPG/WEBP
+    by both extension and magic bytes are not copied (and not linked).
+    """
+    rejected = 0
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if not info.filename.startswith(ZIP_PHOTOS_DIR) or info.is_dir():
+                continue
+            name = secure_filename(info.filename[len(ZIP_PHOTOS_DIR):])
+            dest = os.path.join(upload_folder, name)
+            if not name or os.path.exists(dest):
+                continue
+            with zf.open(info) as src:
+                head = src.read(MAGIC_HEAD_BYTES)
+                if os.path.splitext(name.lower())[1] not in ALLOWED_EXT or sniff_image_ext(head) is None:
+                    rejected += 1
+                    continue
+                with open(dest, 'wb') as out:
+                    chunk = head
+                    while chunk:
+                        out.write(chunk)
+                        chunk = src.read(64 * 1024)
+
+        with zf.open(ZIP_RECORDS_NAME) as raw:
+            stats = import_records(read_records(raw, 'jsonl'), upload_folder, batch_size)
+    stats['rejected_photos'] = rejected
+    return stats
+
+
+def detect_format(filename: str, default: str = 'jsonl') -> str:
+    ext = os.path.splitext(filename.lower())[1]
+    return {'.csv': 'csv', '.zip': 'zip', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(ext, default)
+
+
+# ---------------------------------------------------------------- CLI
+
+def register_cli(app):
+    @app.cli.group('garden')
+    def garden():
+        """Bulk import/export of plants, photos and reminders, and upload cleanup."""
+
+    @garden.command('export')
+    @click.argument('path', type=click.Path(dir_okay=False, writable=True))
+    @click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv', 'zip']), default=None,
+                  help='Defaults to the file extension.')
+    def export_cmd(path, fmt):
+        """Export the garden to PATH."""
+        fmt = fmt or detect_format(path)
+        if fmt == 'zip':
+            with open(path, 'wb') as f:
+                for chunk in iter_export_zip(app.config['UPLOAD_FOLDER']):
+                    f.write(chunk)
+        else:
+            gen = iter_export_csv() if fmt == 'csv' else iter_export_jsonl()
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(gen)
+        click.echo(f'Exported to {path} ({fmt}).')
+
+    @garden.command('import')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv', 'zip']), default=None,
+                  help='Defaults to the file extension.')
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+                  help='Plants inserted per transaction.')
+    def import_cmd(path, fmt, batch_size):
+        """Import plants from PATH (JSONL, CSV, or a zip made by `garden export`)."""
+        fmt = fmt or detect_format(path)
+        upload_folder = app.config['UPLOAD_FOLDER']
+        if fmt == 'zip':
+            stats = import_zip(path, upload_folder, batch_size)
+        else:
+            with open(path, 'rb') as f:
+                stats = import_records(read_records(f, fmt), upload_folder, batch_size)
+        click.echo(f"Imported {stats['plants']} plants, {stats['photos']} photos, "
+                   f"{stats['reminders']} reminders; skipped {stats['skipped']}.")
+        if stats.get('rejected_photos'):
+            click.echo(f"  {stats['rejected_photos']} file(s) under photos/ are not PNG/JPG/WEBP; not copied.",
+                       err=True)
+        for err in stats['errors']:
+            click.echo(f"  line {err['line']}: {err['error']}", err=True)
+
+    @garden.command('sweep-uploads')
+    @click.option('--grace', default=3600, show_default=True,
+                  help='Skip files modified within this many seconds.')
+    @click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+    def sweep_cmd(grace, dry_run):
+        """Delete upload files no plant refers to, and abandoned partial uploads."""
+        from .reclaim import sweep_orphans
+
+        stats = sweep_orphans(app.config['UPLOAD_FOLDER'], app.config['PARTIAL_UPLOAD_FOLDER'],
+                              grace_seconds=grace, dry_run=dry_run)
+        verb = 'Would delete' if dry_run else 'Deleted'
+        click.echo(f"{verb} {stats['orphans']} orphaned photo(s) and {stats['partials']} partial upload(s), "
+                   f"{stats['bytes'] / (1024 * 1024):.1f} MB.")
+        if stats['failed']:
+            click.echo(f"Could not remove {stats['failed']} file(s); see permissions and re-run.", err=True)
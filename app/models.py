@@ -17,11 +17,16 @@ class Plant(db.Model):
 
     notes = db.Column(db.Text, nullable=True)
 
+    # Household whose devices get this plant's reminders ('' = shared household).
+    owner = db.Column(db.String(120), nullable=False, default='', server_default='', index=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     photos = db.relationship('PlantPhoto', backref='plant', cascade='all, delete-orphan', lazy=True)
     reminders = db.relationship('Reminder', backref='plant', cascade='all, delete-orphan', lazy=True)
+    push_prefs = db.relationship('PlantPushPreference', backref='plant', cascade='all, delete-orphan', lazy=True)
+    upload_sessions = db.relationship('UploadSession', backref='plant', cascade='all, delete-orphan', lazy=True)
 
 
 class PlantPhoto(db.Model):
@@ -31,10 +36,15 @@ class PlantPhoto(db.Model):
     plant_id = db.Column(db.Integer, db.ForeignKey('plants.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 
 class Reminder(db.Model):
     __tablename__ = 'reminders'
+    __table_args__ = (
+        # tick_reminders: active reminders whose next_run_at has passed
+        db.Index('ix_reminders_due', 'active', 'next_run_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     plant_id = db.Column(db.Integer, db.ForeignKey('plants.id'), nullable=False)
@@ -50,6 +60,19 @@ class Reminder(db.Model):
     last_sent_at = db.Column(db.DateTime, nullable=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class UploadSession(db.Model):
+    """A resumable photo upload; received bytes live in PARTIAL_UPLOAD_FOLDER/<id>.part."""
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(32), primary_key=True)
+    plant_id = db.Column(db.Integer, db.ForeignKey('plants.id'), nullable=False, index=True)
+    total_size = db.Column(db.Integer, nullable=False)
+    ext = db.Column(db.String(8), nullable=True)  # set once the magic bytes are validated
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class PushSubscription(db.Model):
@@ -59,4 +82,49 @@ class PushSubscription(db.Model):
     endpoint = db.Column(db.Text, nullable=False, unique=True)
     p256dh = db.Column(db.Text, nullable=False)
     auth = db.Column(db.Text, nullable=False)
+    # Household this device belongs to; matched against Plant.owner.
+    owner = db.Column(db.String(120), nullable=False, default='', server_default='', index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    plant_prefs = db.relationship('PlantPushPreference', backref='subscription', cascade='all, delete-orphan',
+                                  lazy=True)
+
+
+class PlantPushPreference(db.Model):
+    """Per-device override for one plant: follow it outside the household, or mute it."""
+    __tablename__ = 'plant_push_prefs'
+    __table_args__ = (
+        db.UniqueConstraint('subscription_id', 'plant_id', name='uq_plant_push_prefs_sub_plant'),
+    )
+
+    MODES = ('follow', 'mute')
+
+    id = db.Column(db.Integer, primary_key=True)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('push_subscriptions.id'), nullable=False)
+    plant_id = db.Column(db.Integer, db.ForeignKey('plants.id'), nullable=False, index=True)
+    mode = db.Column(db.String(10), nullable=False)  # follow | mute
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SyncTombstone(db.Model):
+    """Records deleted rows so sync clients can drop them too."""
+    __tablename__ = 'sync_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(40), nullable=False)  # plants | plant_photos | reminders
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def _record_tombstone(mapper, connection, target):
+    connection.execute(
+        SyncTombstone.__table__.insert().values(
+            table_name=mapper.local_table.name,
+            row_id=target.id,
+            deleted_at=datetime.utcnow(),
+        )
+    )
+
+
+for _model in (Plant, PlantPhoto, Reminder):
+    db.event.listen(_model, 'after_delete', _record_tombstone)
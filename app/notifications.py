@@ -7,9 +7,11 @@ from datetime import datetime, timedelta, date
 
 from dateutil.relativedelta import relativedelta
 from pywebpush import webpush, WebPushException
+from sqlalchemy import and_, or_, select, union
+from sqlalchemy.orm import aliased
 
 from . import db
-from .models import Reminder, Plant, PushSubscription
+from .models import Reminder, Plant, PlantPushPreference, PushSubscription
 
 
 INTERVAL_RE = re.compile(r"^\s*(\d+)\s*(day|days|week|weeks|month|months)\s*$", re.IGNORECASE)
@@ -68,62 +70,136 @@ def _vapid_keys():
     return pub, priv, subj
 
 
+def _send_push(sub: PushSubscription, payload: str, priv: str, subj: str) -> bool | None:
+    """Send one push. Returns True if sent, False on failure, None if the subscription expired."""
+    try:
+        webpush(
+            subscription_info={
+                'endpoint': sub.endpoint,
+                'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
+            },
+            data=payload,
+            vapid_private_key=priv,
+            vapid_claims={'sub': subj},
+        )
+        return True
+    except WebPushException:
+        # Subscription likely expired.
+        return None
+    except Exception:
+        return False
+
+
+def _drop_subscriptions(subs: list[PushSubscription]):
+    if not subs:
+        return
+    try:
+        for sub in subs:
+            db.session.delete(sub)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
 def send_push_to_all(title: str, body: str, url: str = '/') -> dict:
     pub, priv, subj = _vapid_keys()
     if not pub or not priv:
         return {'ok': False, 'sent': 0, 'error': 'VAPID keys not set. See README.'}
 
     payload = json.dumps({'title': title, 'body': body, 'url': url})
-    subs = PushSubscription.query.all()
     sent = 0
-    for sub in subs:
-        try:
-            webpush(
-                subscription_info={
-                    'endpoint': sub.endpoint,
-                    'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
-                },
-                data=payload,
-                vapid_private_key=priv,
-                vapid_claims={'sub': subj},
-            )
+    expired = []
+    for sub in PushSubscription.query.all():
+        result = _send_push(sub, payload, priv, subj)
+        if result:
             sent += 1
-        except WebPushException:
-            # Subscription likely expired; remove it.
-            try:
-                db.session.delete(sub)
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-        except Exception:
-            continue
+        elif result is None:
+            expired.append(sub)
+    _drop_subscriptions(expired)
     return {'ok': True, 'sent': sent, 'error': None}
 
 
-def tick_reminders():
-    """Called by scheduler. Sends due reminder notifications and schedules next run."""
-    now = datetime.utcnow()
-    due = (
-        Reminder.query
-        .filter(Reminder.active == True)  # noqa: E712
-        .filter(Reminder.next_run_at.isnot(None))
-        .filter(Reminder.next_run_at <= now)
-        .all()
+def _due_filter(now: datetime):
+    return and_(
+        Reminder.active == True,  # noqa: E712
+        Reminder.next_run_at.isnot(None),
+        Reminder.next_run_at <= now,
     )
 
-    for rem in due:
-        plant = Plant.query.get(rem.plant_id)
-        if not plant:
-            continue
 
+def due_reminder_recipients(now: datetime) -> list[tuple[Reminder, Plant, PushSubscription | None]]:
+    """Due reminders with the devices that should hear about them, in one query.
+
+    A device receives a plant's reminders when it belongs to the plant's
+    household (PushSubscription.owner == Plant.owner) and has not muted the
+    plant, or when it explicitly follows the plant. Due reminders without
+    any recipient come back once with subscription None.
+    """
+    pref = aliased(PlantPushPreference)
+    household = (
+        select(Reminder.id.label('reminder_id'), PushSubscription.id.label('subscription_id'))
+        .join(Plant, Plant.id == Reminder.plant_id)
+        .join(PushSubscription, PushSubscription.owner == Plant.owner)
+        .outerjoin(pref, and_(pref.subscription_id == PushSubscription.id, pref.plant_id == Plant.id))
+        .where(_due_filter(now), or_(pref.mode.is_(None), pref.mode != 'mute'))
+    )
+    followers = (
+        select(Reminder.id, PlantPushPreference.subscription_id)
+        .join(PlantPushPreference, PlantPushPreference.plant_id == Reminder.plant_id)
+        .where(_due_filter(now), PlantPushPreference.mode == 'follow')
+    )
+    pairs = union(household, followers).subquery()
+
+    stmt = (
+        select(Reminder, Plant, PushSubscription)
+        .join(Plant, Plant.id == Reminder.plant_id)
+        .outerjoin(pairs, pairs.c.reminder_id == Reminder.id)
+        .outerjoin(PushSubscription, PushSubscription.id == pairs.c.subscription_id)
+        .where(_due_filter(now))
+    )
+    return db.session.execute(stmt).all()
+
+
+def _reminder_payload(items: list[tuple[Reminder, Plant]]) -> str:
+    if len(items) == 1:
+        rem, plant = items[0]
         title = f"Reminder: {plant.name}"
         body = f"Scheduled: every {rem.interval_text} at {rem.time_of_day}".strip()
+        url = f"/plants/{plant.id}"
+    else:
+        # Several plants due for the same device: one notification instead of many.
+        names = sorted({plant.name for _, plant in items})
+        title = f"{len(names)} plants need attention"
+        body = ', '.join(names[:5]) + (' …' if len(names) > 5 else '')
+        url = '/plants'
+    return json.dumps({'title': title, 'body': body, 'url': url})
 
-        send_push_to_all(title, body, url=f"/plants/{plant.id}")
 
+def tick_reminders():
+    """Called by scheduler. Sends due reminder notifications and schedules next run."""
+    now = datetime.utcnow()
+    rows = due_reminder_recipients(now)
+    if not rows:
+        return
+
+    due: dict[int, Reminder] = {}
+    per_device: dict[int, tuple[PushSubscription, list[tuple[Reminder, Plant]]]] = {}
+    for rem, plant, sub in rows:
+        due[rem.id] = rem
+        if sub is not None:
+            per_device.setdefault(sub.id, (sub, []))[1].append((rem, plant))
+
+    pub, priv, subj = _vapid_keys()
+    expired = []
+    if pub and priv:
+        for sub, items in per_device.values():
+            if _send_push(sub, _reminder_payload(items), priv, subj) is None:
+                expired.append(sub)
+
+    for rem in due.values():
         rem.last_sent_at = now
         # roll next run forward
         rem.next_run_at = compute_next_run(rem.interval_text, rem.time_of_day, start=now.date(), now=now)
+    db.session.commit()
 
-    if due:
-        db.session.commit()
+    _drop_subscriptions(expired)
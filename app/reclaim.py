@@ -0,0 +1,129 @@
+"""Deferred removal of upload files.
+
+Deleting plants only removes rows; their photo filenames are queued here
+after the commit and the scheduler unlinks them in batches, off the request
+path. The queue is in-process, so anything lost on restart (or left behind
+by older versions) is caught by sweep_orphans, exposed as
+`flask garden sweep-uploads`.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import time
+from datetime import timedelta
+
+from . import db
+from .models import PlantPhoto, UploadSession
+
+
+RECLAIM_BATCH = 500
+
+# Partial uploads untouched for this long are considered abandoned.
+STALE_UPLOAD_AGE = timedelta(hours=24)
+
+_pending: queue.SimpleQueue[str] = queue.SimpleQueue()
+
+
+def enqueue(filenames) -> None:
+    """Schedule upload files for removal. Call only after the rows are committed."""
+    for name in filenames:
+        if name:
+            _pending.put(name)
+
+
+def _still_referenced(filenames: list[str]) -> set[str]:
+    # Imports may point several photos at one file; keep files still in use.
+    rows = db.session.query(PlantPhoto.filename).filter(PlantPhoto.filename.in_(filenames)).all()
+    return {r[0] for r in rows}
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def reclaim_pending(upload_folder: str, limit: int = RECLAIM_BATCH) -> int:
+    """Unlink up to `limit` queued files; returns how many were removed."""
+    batch = []
+    while len(batch) < limit:
+        try:
+            batch.append(_pending.get_nowait())
+        except queue.Empty:
+            break
+    if not batch:
+        return 0
+
+    keep = _still_referenced(batch)
+    removed = 0
+    for name in batch:
+        if name in keep:
+            continue
+        try:
+            removed += _unlink(os.path.join(upload_folder, os.path.basename(name)))
+        except OSError:
+            continue
+    return removed
+
+
+def sweep_orphans(upload_folder: str, partial_folder: str, grace_seconds: int = 3600,
+                  dry_run: bool = False) -> dict:
+    """Delete upload files no PlantPhoto refers to, and abandoned partial uploads.
+
+    Files younger than `grace_seconds` are skipped so uploads that are being
+    finalised right now are not raced. Files that cannot be removed (e.g.
+    permissions) are counted under `failed` and left for the next run.
+    """
+    stats = {'orphans': 0, 'partials': 0, 'bytes': 0, 'failed': 0}
+    cutoff = time.time() - grace_seconds
+
+    referenced = {name for (name,) in db.session.query(PlantPhoto.filename).yield_per(5000)}
+    with os.scandir(upload_folder) as it:
+        for entry in it:
+            if not entry.is_file() or entry.name in referenced or entry.name.startswith('.'):
+                continue
+            st = entry.stat()
+            if st.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    _unlink(entry.path)
+                except OSError:
+                    stats['failed'] += 1
+                    continue
+            stats['orphans'] += 1
+            stats['bytes'] += st.st_size
+
+    # Partial uploads: drop files with no session, and sessions idle too long.
+    stale_cutoff = time.time() - STALE_UPLOAD_AGE.total_seconds()
+    live = {upload_id for (upload_id,) in db.session.query(UploadSession.id)}
+    abandoned = []
+    if os.path.isdir(partial_folder):
+        with os.scandir(partial_folder) as it:
+            for entry in it:
+                upload_id, ext = os.path.splitext(entry.name)
+                if not entry.is_file() or ext != '.part':
+                    continue
+                st = entry.stat()
+                if upload_id in live:
+                    if st.st_mtime > stale_cutoff:
+                        continue
+                    abandoned.append(upload_id)
+                elif st.st_mtime > cutoff:
+                    continue
+                if not dry_run:
+                    try:
+                        _unlink(entry.path)
+                    except OSError:
+                        stats['failed'] += 1
+                        continue
+                stats['partials'] += 1
+                stats['bytes'] += st.st_size
+    if abandoned and not dry_run:
+        UploadSession.query.filter(UploadSession.id.in_(abandoned)).delete(synchronize_session=False)
+        db.session.commit()
+    return stats
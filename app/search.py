@@ -0,0 +1,151 @@
+"""Plant search.
+
+On SQLite we query the `plants_fts` FTS5 index (see db_migrate) with prefix
+matching, bm25 ranking and highlighted snippets. Other backends, or SQLite
+builds without FTS5, fall back to LIKE filters over the same columns.
+"""
+
+from __future__ import annotations
+
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import selectinload
+
+from . import db
+from .db_migrate import PLANT_FTS_COLUMNS
+from .models import Plant
+
+
+MAX_RESULTS = 100
+
+# Per-column bm25 weights, same order as PLANT_FTS_COLUMNS.
+_FTS_WEIGHTS = (10.0, 6.0, 2.0, 1.0, 1.0, 1.0, 1.0)
+
+# Control characters used as highlight markers so user text can be escaped
+# before the markers are turned into <mark> tags.
+_HL_OPEN, _HL_CLOSE = '\x02', '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokens(q: str) -> list[str]:
+    return _TOKEN_RE.findall(q or '')[:8]
+
+
+def _to_markup(s: str | None) -> Markup:
+    html = str(escape(s or ''))
+    return Markup(html.replace(_HL_OPEN, '<mark>').replace(_HL_CLOSE, '</mark>'))
+
+
+def _fts_available() -> bool:
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    row = db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type='table' AND name='plants_fts'")
+    ).fetchone()
+    return row is not None
+
+
+def _fts_query(tokens: list[str]) -> str:
+    # Quote every token so FTS operators in user input are treated literally,
+    # and make the last one a prefix query for search-as-you-type.
+    parts = [f'"{t}"' for t in tokens]
+    parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def _search_fts(tokens: list[str], limit: int) -> list[dict]:
+    weights = ', '.join(str(w) for w in _FTS_WEIGHTS)
+    # One snippet per non-name column; snippet(..., -1, ...) would pick the
+    # name itself when only the name matches, repeating it under the title.
+    snippets = ', '.join(
+        f"snippet(plants_fts, {i}, :o, :c, '…', 12)" for i in range(1, len(PLANT_FTS_COLUMNS))
+    )
+    rows = db.session.execute(
+        text(
+            f"""
+            SELECT rowid,
+                   highlight(plants_fts, 0, :o, :c) AS name_hl,
+                   bm25(plants_fts, {weights}) AS rank,
+                   {snippets}
+            FROM plants_fts
+            WHERE plants_fts MATCH :q
+            ORDER BY rank
+            LIMIT :limit
+            """
+        ),
+        {'o': _HL_OPEN, 'c': _HL_CLOSE, 'q': _fts_query(tokens), 'limit': limit},
+    ).fetchall()
+    if not rows:
+        return []
+
+    # Results render a thumbnail; load photos in one query, not one per row.
+    plants = {
+        p.id: p
+        for p in Plant.query.options(selectinload(Plant.photos)).filter(Plant.id.in_([r[0] for r in rows])).all()
+    }
+    results = []
+    for plant_id, name_hl, rank, *snips in rows:
+        plant = plants.get(plant_id)
+        if not plant:
+            continue
+        # First non-name column with a match, like the LIKE fallback.
+        snip = next((s for s in snips if s and _HL_OPEN in s), '')
+        results.append({
+            'plant': plant,
+            'name': _to_markup(name_hl),
+            'snippet': _to_markup(snip),
+            'rank': rank,
+        })
+    return results
+
+
+def _highlight(value: str | None, tokens: list[str]) -> Markup:
+    value = value or ''
+    pattern = re.compile('|'.join(re.escape(t) for t in tokens), re.IGNORECASE)
+    return _to_markup(pattern.sub(lambda m: f'{_HL_OPEN}{m.group(0)}{_HL_CLOSE}', value))
+
+
+def _search_like(tokens: list[str], limit: int) -> list[dict]:
+    columns = [getattr(Plant, c) for c in PLANT_FTS_COLUMNS]
+    clauses = []
+    for t in tokens:
+        pattern = '%' + t.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        clauses.append(or_(*[col.ilike(pattern, escape='\\') for col in columns]))
+
+    plants = (
+        Plant.query.options(selectinload(Plant.photos))
+        .filter(and_(*clauses)).order_by(Plant.name).limit(limit).all()
+    )
+    results = []
+    for plant in plants:
+        # First matching non-name column serves as the snippet.
+        snippet = ''
+        for c in PLANT_FTS_COLUMNS[1:]:
+            value = getattr(plant, c) or ''
+            if any(t.lower() in value.lower() for t in tokens):
+                snippet = value if len(value) <= 120 else value[:117] + '…'
+                break
+        results.append({
+            'plant': plant,
+            'name': _highlight(plant.name, tokens),
+            'snippet': _highlight(snippet, tokens),
+            'rank': None,
+        })
+    return results
+
+
+def search_plants(q: str, limit: int = 50) -> list[dict]:
+    """Return ranked matches for `q` as dicts with plant, name, snippet and rank.
+
+    `name` and `snippet` are Markup with matches wrapped in <mark>.
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    if _fts_available():
+        return _search_fts(tokens, limit)
+    return _search_like(tokens, limit)
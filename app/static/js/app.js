@@ -27,6 +27,87 @@ function previewFiles(input){
   }
 }
 
+// -----------------------------
+// Resumable photo uploads
+// -----------------------------
+
+const UPLOAD_CHUNK = 1024 * 1024;
+
+async function uploadOffset(id){
+  const r = await fetch(`/api/v1/uploads/${id}`, {cache: 'no-store'});
+  const j = await r.json();
+  if(!j.ok) throw Object.assign(new Error(j.error || 'Upload lost'), {fatal: true});
+  return j.offset;
+}
+
+// Sends the file in chunks; after a network error, or while an earlier
+// stalled request still holds the upload (423), it backs off, asks the
+// server for the current offset and resends only what is missing.
+async function uploadPhotoResumable(plantId, file, onProgress){
+  let r = await fetch('/api/v1/uploads', {
+    method: 'POST',
+    headers: {'Content-Type':'application/json'},
+    body: JSON.stringify({plant_id: plantId, size: file.size})
+  });
+  let j = await r.json();
+  if(!j.ok) throw new Error(j.error || 'Upload failed');
+  const id = j.upload_id;
+  let offset = 0;
+  let retries = 0;
+  let resync = false;
+  while(offset < file.size){
+    try{
+      if(resync){
+        offset = await uploadOffset(id);
+        resync = false;
+        continue;
+      }
+      r = await fetch(`/api/v1/uploads/${id}`, {
+        method: 'PATCH',
+        headers: {'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream'},
+        body: file.slice(offset, offset + UPLOAD_CHUNK)
+      });
+      j = await r.json();
+      if(r.status === 409){ offset = j.offset; continue; }
+      if(r.status === 423) throw new Error(j.error || 'Upload busy');
+      if(!j.ok) throw Object.assign(new Error(j.error || 'Upload failed'), {fatal: true});
+      offset = j.offset;
+      retries = 0;
+      if(onProgress) onProgress(offset / file.size);
+    }catch(e){
+      if(e.fatal || ++retries > 5) throw e;
+      await new Promise((res)=>setTimeout(res, 1000 * retries));
+      resync = true;
+    }
+  }
+  return j.photo;
+}
+
+window.addEventListener('DOMContentLoaded', ()=>{
+  document.querySelectorAll('form[data-resumable-upload]').forEach((form)=>{
+    form.addEventListener('submit', async (e)=>{
+      if(!window.fetch || !Blob.prototype.slice) return;  // plain form post
+      e.preventDefault();
+      const input = form.querySelector('input[type=file]');
+      const btn = form.querySelector('button[type=submit]');
+      const files = Array.from(input.files || []);
+      btn.disabled = true;
+      try{
+        for(let i = 0; i < files.length; i++){
+          await uploadPhotoResumable(form.dataset.plantId, files[i], (p)=>{
+            btn.textContent = `${i + 1}/${files.length} · ${Math.round(p * 100)}%`;
+          });
+        }
+        window.location.reload();
+      }catch(err){
+        btn.disabled = false;
+        btn.textContent = 'Upload';
+        alert('Upload failed: ' + (err && err.message ? err.message : String(err)));
+      }
+    });
+  });
+});
+
 // -----------------------------
 // Web Push Notifications
 // -----------------------------
@@ -67,10 +148,11 @@ async function subscribePush(){
     applicationServerKey: urlBase64ToUint8Array(key)
   });
 
+  const payload = Object.assign(sub.toJSON(), {owner: getHousehold()});
   const r = await fetch('/push/subscribe', {
     method: 'POST',
     headers: {'Content-Type':'application/json'},
-    body: JSON.stringify(sub)
+    body: JSON.stringify(payload)
   });
   const j = await r.json();
   if(!j.ok) throw new Error(j.error || 'Subscribe failed');
@@ -90,6 +172,25 @@ async function unsubscribePush(){
   return true;
 }
 
+function getHousehold(){
+  return (localStorage.getItem('pushHousehold') || '').trim();
+}
+
+// Per-plant override for this device: 'follow', 'mute' or 'default'.
+async function setPlantPush(plantId, mode){
+  const reg = await ensureServiceWorker();
+  const sub = await reg.pushManager.getSubscription();
+  if(!sub) throw new Error('Enable notifications in Settings first');
+  const r = await fetch(`/push/plants/${plantId}/preference`, {
+    method: 'POST',
+    headers: {'Content-Type':'application/json'},
+    body: JSON.stringify({endpoint: sub.endpoint, mode})
+  });
+  const j = await r.json();
+  if(!j.ok) throw new Error(j.error || 'Update failed');
+  return j.mode;
+}
+
 function setPushStatus(msg){
   const el = document.getElementById('pushStatus');
   if(el) el.textContent = msg;
@@ -98,6 +199,24 @@ function setPushStatus(msg){
 window.addEventListener('DOMContentLoaded', ()=>{
   const en = document.getElementById('btnEnablePush');
   const dis = document.getElementById('btnDisablePush');
+  const household = document.getElementById('pushHousehold');
+  if(household){
+    household.value = getHousehold();
+    household.addEventListener('change', ()=>{
+      localStorage.setItem('pushHousehold', household.value.trim());
+      setPushStatus('Household saved. Enable notifications again to apply it.');
+    });
+  }
+  document.querySelectorAll('[data-plant-push]').forEach((btn)=>{
+    btn.addEventListener('click', async ()=>{
+      try{
+        const mode = await setPlantPush(btn.dataset.plantId, btn.dataset.plantPush);
+        setPushStatus(mode === 'default' ? 'Using household setting ✅' : (mode === 'follow' ? 'Following ✅' : 'Muted ✅'));
+      }catch(e){
+        setPushStatus('Failed: ' + (e && e.message ? e.message : String(e)));
+      }
+    });
+  });
   if(en){
     en.addEventListener('click', async ()=>{
       try{
@@ -4,6 +4,20 @@ from werkzeug.utils import secure_filename
 
 ALLOWED_EXT = {'.png', '.jpg', '.jpeg', '.webp'}
 
+# Bytes needed to recognise every supported format (WEBP: RIFF....WEBP).
+MAGIC_HEAD_BYTES = 12
+
+
+def sniff_image_ext(head: bytes) -> str | None:
+    """Return the file extension for an image's leading bytes, or None if unsupported."""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
 
 def save_upload(file_storage, upload_folder: str) -> str:
     filename = secure_filename(file_storage.filename or '')